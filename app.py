@@ -1,12 +1,16 @@
-from flask import Flask, g
+from flask import Flask, g, request
 from flask_cors import CORS
 from pymongo import MongoClient
 from dotenv import load_dotenv
+from utils.health import HealthMonitor, requests_in_flight
+from utils.profiling import profiler
 import os
 
 # Load environment variables
 load_dotenv()
 
+HEALTH_ENDPOINTS = ('health_check', 'liveness_check', 'readiness_check')
+
 def create_app():
     app = Flask(__name__)
     
@@ -15,6 +19,15 @@ def create_app():
     app.config['MONGO_URI'] = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
     app.config['DB_NAME'] = os.getenv('DB_NAME', 'login')
     app.config['PORT'] = int(os.getenv('PORT', 8080))
+    app.config['MONGO_MAX_POOL_SIZE'] = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+    app.config['HEALTH_CHECK_INTERVAL'] = float(os.getenv('HEALTH_CHECK_INTERVAL', 5))
+    app.config['WORKER_THREADS'] = int(os.getenv('WORKER_THREADS', 1))
+    # In-flight limits default to "every other thread is busy"; a single-threaded
+    # worker can only answer a probe when idle, so the checks are off there
+    busy_threads = max(app.config['WORKER_THREADS'] - 1, 0) or None
+    app.config['HEALTH_MAX_HASHING_IN_FLIGHT'] = int(os.getenv('HEALTH_MAX_HASHING_IN_FLIGHT', 0)) or busy_threads
+    app.config['HEALTH_MAX_REQUESTS_IN_FLIGHT'] = int(os.getenv('HEALTH_MAX_REQUESTS_IN_FLIGHT', 0)) or busy_threads
+    app.config['PROFILING_ENABLED'] = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
     
     # Validate SECRET_KEY
     if not app.config['SECRET_KEY']:
@@ -31,12 +44,31 @@ def create_app():
         }
     })
     
+    # Background health monitor (pings and driver events, served from memory)
+    health_monitor = HealthMonitor(
+        interval=app.config['HEALTH_CHECK_INTERVAL'],
+        max_pool_size=app.config['MONGO_MAX_POOL_SIZE'],
+        max_hashing_in_flight=app.config['HEALTH_MAX_HASHING_IN_FLIGHT'],
+        max_requests_in_flight=app.config['HEALTH_MAX_REQUESTS_IN_FLIGHT']
+    )
+    app.extensions['health_monitor'] = health_monitor
+    
     # MongoDB Client (singleton)
-    mongo_client = MongoClient(app.config['MONGO_URI'])
+    mongo_client = MongoClient(
+        app.config['MONGO_URI'],
+        maxPoolSize=app.config['MONGO_MAX_POOL_SIZE'],
+        event_listeners=health_monitor.listeners
+    )
     
     @app.before_request
     def before_request():
         """Set up database connection before each request"""
+        # Probes are not counted, so they never see themselves as load
+        if request.endpoint not in HEALTH_ENDPOINTS:
+            requests_in_flight.increment()
+            g.in_flight = True
+        # Started lazily so the ping thread lives in the serving process, not a pre-fork master
+        health_monitor.start(mongo_client)
         if not hasattr(g, 'mongo'):
             g.mongo = type('obj', (object,), {
                 'db': mongo_client[app.config['DB_NAME']]
@@ -48,19 +80,34 @@ def create_app():
         mongo = g.pop('mongo', None)
         # Connection pooling handles cleanup automatically
     
+    @app.teardown_request
+    def teardown_in_flight(exception=None):
+        """Mark the request as no longer in flight"""
+        if g.pop('in_flight', False):
+            requests_in_flight.decrement()
+    
     # Register blueprints
     from routes.auth import auth_bp
     app.register_blueprint(auth_bp)
     
-    # Health check endpoint
+    # Opt-in profiling surface (manager only)
+    if app.config['PROFILING_ENABLED']:
+        from routes.profiling import profiling_bp
+        profiler.init_app(app)
+        app.register_blueprint(profiling_bp)
+    
+    # Health check endpoints (answered from the monitor's cached state)
     @app.route('/health')
     def health_check():
-        try:
-            # Test database connection
-            mongo_client.admin.command('ping')
-            return {'status': 'healthy', 'database': 'connected'}, 200
-        except Exception as e:
-            return {'status': 'unhealthy', 'error': str(e)}, 500
+        return health_monitor.database_health()
+    
+    @app.route('/health/live')
+    def liveness_check():
+        return health_monitor.liveness()
+    
+    @app.route('/health/ready')
+    def readiness_check():
+        return health_monitor.readiness()
     
     # Root endpoint
     @app.route('/')
@@ -70,6 +117,8 @@ def create_app():
             'version': '1.0.0',
             'endpoints': {
                 'health': '/health',
+                'liveness': '/health/live',
+                'readiness': '/health/ready',
                 'auth': '/api/auth/*'
             }
         }, 200
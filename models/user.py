@@ -1,12 +1,15 @@
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from bson import ObjectId
+from utils.health import hashing_in_flight
+from utils.profiling import profiled, span
 import re
 
 class User:
     def __init__(self, db):
         self.collection = db.users
         
+    @profiled()
     def create_user(self, user_data):
         """Create a new user account"""
         try:
@@ -36,12 +39,15 @@ class User:
             if user_data.get('phone') and not self._is_valid_phone(user_data['phone']):
                 return {'error': 'Invalid phone number format'}, 400
             
+            with hashing_in_flight, span('generate_password_hash'):
+                password_hash = generate_password_hash(user_data['password'])
+            
             # Create user document
             user_doc = {
                 'first_name': user_data['first_name'].strip().title(),
                 'last_name': user_data['last_name'].strip().title(),
                 'email': user_data['email'].lower().strip(),
-                'password_hash': generate_password_hash(user_data['password']),
+                'password_hash': password_hash,
                 'user_type': user_data['user_type'],
                 'phone': user_data.get('phone', '').strip(),
                 'is_active': True,
@@ -89,6 +95,7 @@ class User:
             print(f"Error creating user: {str(e)}")
             return {'error': 'Internal server error'}, 500
     
+    @profiled()
     def get_user_by_email(self, email):
         """Get user by email"""
         try:
@@ -100,6 +107,7 @@ class User:
             print(f"Error getting user by email: {str(e)}")
             return None
     
+    @profiled()
     def get_user_by_id(self, user_id):
         """Get user by ID"""
         try:
@@ -112,17 +120,43 @@ class User:
             print(f"Error getting user by ID: {str(e)}")
             return None
     
+    @profiled()
+    def get_users_by_ids(self, user_ids, fields=None):
+        """Get many users by ID with a single query, keyed by ID (None if not found)"""
+        results = {self.normalize_id(user_id): None for user_id in user_ids}
+        try:
+            object_ids = [ObjectId(user_id) for user_id in results if ObjectId.is_valid(user_id)]
+            if not object_ids:
+                return results
+            
+            # An empty projection returns whole documents, so fall back to excluding the hash
+            projection = {field: 1 for field in fields or [] if field != 'password_hash'}
+            if not projection:
+                projection = {'password_hash': 0}
+            
+            for user in self.collection.find({'_id': {'$in': object_ids}}, projection):
+                user['_id'] = str(user['_id'])
+                user.pop('password_hash', None)  # Remove password hash from response
+                results[user['_id']] = user
+            return results
+        except Exception as e:
+            print(f"Error getting users by IDs: {str(e)}")
+            return None
+    
+    @profiled()
     def verify_password(self, email, password):
         """Verify user password"""
         try:
             user = self.collection.find_one({'email': email.lower()})
-            if user and check_password_hash(user['password_hash'], password):
-                return True
-            return False
+            if not user:
+                return False
+            with hashing_in_flight, span('check_password_hash'):
+                return check_password_hash(user['password_hash'], password)
         except Exception as e:
             print(f"Error verifying password: {str(e)}")
             return False
     
+    @profiled()
     def update_last_login(self, user_id):
         """Update user's last login timestamp"""
         try:
@@ -133,6 +167,7 @@ class User:
         except Exception as e:
             print(f"Error updating last login: {str(e)}")
     
+    @profiled()
     def get_all_users(self, user_type=None, skip=0, limit=50):
         """Get all users with optional filtering"""
         try:
@@ -156,6 +191,7 @@ class User:
             print(f"Error getting all users: {str(e)}")
             return {'users': [], 'total': 0, 'skip': skip, 'limit': limit}
     
+    @profiled()
     def update_user(self, user_id, update_data):
         """Update user information"""
         try:
@@ -176,6 +212,7 @@ class User:
             print(f"Error updating user: {str(e)}")
             return False
     
+    @profiled()
     def delete_user(self, user_id):
         """Soft delete user (set is_active to False)"""
         try:
@@ -188,6 +225,12 @@ class User:
             print(f"Error deleting user: {str(e)}")
             return False
     
+    @staticmethod
+    def normalize_id(user_id):
+        """Canonical string form of a user ID (lowercase hex when it is a valid ObjectId)"""
+        user_id = str(user_id)
+        return str(ObjectId(user_id)) if ObjectId.is_valid(user_id) else user_id
+    
     def _is_valid_email(self, email):
         """Validate email format"""
         email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
@@ -5,9 +5,13 @@ import jwt
 from datetime import datetime, timedelta
 from functools import wraps
 from bson import ObjectId
+from utils.profiling import profiled_jsonify, span
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+# Upper bound on IDs accepted by the batch user lookup
+MAX_BATCH_USER_IDS = 5000
+
 def token_required(f):
     """Decorator to require valid JWT token"""
     @wraps(f)
@@ -27,7 +31,8 @@ def token_required(f):
         
         try:
             # Decode token
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+            with span('jwt.decode'):
+                data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
             current_user_id = data['user_id']
             
             # Get user from database
@@ -66,7 +71,7 @@ def register():
         # Create user
         result, status_code = user_model.create_user(data)
         
-        return jsonify(result), status_code
+        return profiled_jsonify(result), status_code
         
     except Exception as e:
         print(f"Registration error: {str(e)}")
@@ -123,11 +128,12 @@ def login():
         
         try:
             # Use PyJWT 2.0+ compatible encoding
-            token = jwt.encode(
-                token_payload, 
-                current_app.config['SECRET_KEY'], 
-                algorithm='HS256'
-            )
+            with span('jwt.encode'):
+                token = jwt.encode(
+                    token_payload, 
+                    current_app.config['SECRET_KEY'], 
+                    algorithm='HS256'
+                )
             
             # Handle both string and bytes return types
             if isinstance(token, bytes):
@@ -144,7 +150,7 @@ def login():
         user_response.pop('password_hash', None)
         user_response['_id'] = user_id_str  # Ensure _id is string
         
-        return jsonify({
+        return profiled_jsonify({
             'message': 'Login successful',
             'token': token,
             'user': user_response
@@ -167,7 +173,7 @@ def logout(current_user):
 @token_required
 def get_profile(current_user):
     """Get current user profile"""
-    return jsonify({
+    return profiled_jsonify({
         'message': 'Profile retrieved successfully',
         'user': current_user
     }), 200
@@ -190,7 +196,7 @@ def update_profile(current_user):
         if user_model.update_user(current_user['_id'], data):
             # Get updated user data
             updated_user = user_model.get_user_by_id(current_user['_id'])
-            return jsonify({
+            return profiled_jsonify({
                 'message': 'Profile updated successfully',
                 'user': updated_user
             }), 200
@@ -222,7 +228,7 @@ def get_users(current_user):
         # Get users
         result = user_model.get_all_users(user_type, skip, limit)
         
-        return jsonify({
+        return profiled_jsonify({
             'message': 'Users retrieved successfully',
             **result
         }), 200
@@ -231,6 +237,57 @@ def get_users(current_user):
         print(f"Get users error: {str(e)}")
         return jsonify({'error': 'Failed to retrieve users'}), 500
 
+@auth_bp.route('/users/batch', methods=['POST'])
+@token_required
+def get_users_by_ids(current_user):
+    """Get many users by ID in one request (manager only or own profile)"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        
+        user_ids = data.get('ids')
+        fields = data.get('fields')
+        
+        if not isinstance(user_ids, list) or not user_ids:
+            return jsonify({'error': 'ids must be a non-empty list'}), 400
+        
+        if len(user_ids) > MAX_BATCH_USER_IDS:
+            return jsonify({'error': f'At most {MAX_BATCH_USER_IDS} ids allowed per request'}), 400
+        
+        if fields is not None and (not isinstance(fields, list) or not all(isinstance(field, str) for field in fields)):
+            return jsonify({'error': 'fields must be a list of field names'}), 400
+        
+        user_ids = [User.normalize_id(user_id) for user_id in user_ids]
+        
+        # Same rule as the single-user route: managers see anyone, others only themselves
+        if current_user.get('user_type') != 'manager' and any(user_id != str(current_user['_id']) for user_id in user_ids):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        # Initialize user model
+        from flask import g
+        user_model = User(g.mongo.db)
+        
+        # Get users
+        users = user_model.get_users_by_ids(user_ids, fields)
+        
+        if users is None:
+            return jsonify({'error': 'Failed to retrieve users'}), 500
+        
+        return profiled_jsonify({
+            'message': 'Users retrieved successfully',
+            'users': users,
+            'not_found': [user_id for user_id, user in users.items() if user is None]
+        }), 200
+        
+    except Exception as e:
+        print(f"Get users by IDs error: {str(e)}")
+        return jsonify({'error': 'Failed to retrieve users'}), 500
+
 @auth_bp.route('/users/<user_id>', methods=['GET'])
 @token_required
 def get_user_by_id(current_user, user_id):
@@ -250,7 +307,7 @@ def get_user_by_id(current_user, user_id):
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify({
+        return profiled_jsonify({
             'message': 'User retrieved successfully',
             'user': user
         }), 200
@@ -304,7 +361,8 @@ def verify_token():
             return jsonify({'error': 'Token is missing', 'valid': False}), 401
         
         # Decode token
-        data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        with span('jwt.decode'):
+            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
         
         # Get user from database
         from flask import g
@@ -314,7 +372,7 @@ def verify_token():
         if not user or not user.get('is_active'):
             return jsonify({'error': 'Invalid or inactive user', 'valid': False}), 401
         
-        return jsonify({
+        return profiled_jsonify({
             'message': 'Token is valid',
             'valid': True,
             'user': user
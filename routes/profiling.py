@@ -0,0 +1,112 @@
+from flask import Blueprint, request, jsonify
+from routes.auth import token_required
+from utils.profiling import profiler
+from functools import wraps
+import os
+
+# Profiling sessions are per worker process: /start arms only the worker that
+# handles it, and /stacks and /requests return only that worker's results.
+# Every response names its worker (X-Worker-Pid header and a 'pid' field), so
+# run with a single worker, or repeat the calls until the same pid answers.
+profiling_bp = Blueprint('profiling', __name__, url_prefix='/api/profiling')
+
+MAX_DURATION = 600
+
+def manager_required(f):
+    """Decorator to restrict profiling endpoints to managers"""
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        if current_user.get('user_type') != 'manager':
+            return jsonify({'error': 'Access denied. Manager role required.'}), 403
+        return f(current_user, *args, **kwargs)
+    return decorated
+
+@profiling_bp.after_request
+def add_worker_pid(response):
+    """Tag every profiling response with the worker that produced it"""
+    response.headers['X-Worker-Pid'] = str(os.getpid())
+    return response
+
+@profiling_bp.route('/start', methods=['POST'])
+@token_required
+@manager_required
+def start_profiling(current_user):
+    """Arm this worker's sampling profiler for N seconds, optionally only for a route or header"""
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        
+        for field in ('route', 'header', 'header_value'):
+            if data.get(field) is not None and not isinstance(data[field], str):
+                return jsonify({'error': f'{field} must be a string'}), 400
+
+        try:
+            duration = float(data.get('duration', 30))
+            interval_ms = float(data.get('interval_ms', 10))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Duration and interval must be numbers'}), 400
+
+        if not 0 < duration <= MAX_DURATION:
+            return jsonify({'error': f'Duration must be between 0 and {MAX_DURATION} seconds'}), 400
+        if not 1 <= interval_ms <= 1000:
+            return jsonify({'error': 'Interval must be between 1 and 1000 milliseconds'}), 400
+
+        profiler.arm(
+            duration,
+            route=data.get('route'),
+            header=data.get('header'),
+            header_value=data.get('header_value'),
+            interval=interval_ms / 1000
+        )
+
+        return jsonify({
+            'message': 'Profiling started',
+            'pid': os.getpid(),
+            'profiler': profiler.status()
+        }), 200
+
+    except Exception as e:
+        print(f"Start profiling error: {str(e)}")
+        return jsonify({'error': 'Failed to start profiling'}), 500
+
+@profiling_bp.route('/stop', methods=['POST'])
+@token_required
+@manager_required
+def stop_profiling(current_user):
+    """Disarm this worker's profiler, keeping collected results"""
+    profiler.disarm()
+    return jsonify({
+        'message': 'Profiling stopped',
+        'pid': os.getpid(),
+        'profiler': profiler.status()
+    }), 200
+
+@profiling_bp.route('/status', methods=['GET'])
+@token_required
+@manager_required
+def profiling_status(current_user):
+    """Get this worker's profiler state"""
+    return jsonify({'pid': os.getpid(), 'profiler': profiler.status()}), 200
+
+@profiling_bp.route('/stacks', methods=['GET'])
+@token_required
+@manager_required
+def get_stacks(current_user):
+    """Get this worker's sampled stacks in collapsed format, ready for flamegraph tools"""
+    collapsed = profiler.collapsed(request.args.get('route'))
+    return collapsed, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
+@profiling_bp.route('/requests', methods=['GET'])
+@token_required
+@manager_required
+def get_request_spans(current_user):
+    """Get this worker's per-request span breakdowns and a per-route summary"""
+    route = request.args.get('route')
+    recorded = [r for r in list(profiler.requests) if route is None or r['route'] == route]
+    return jsonify({
+        'pid': os.getpid(),
+        'summary': profiler.summary(),
+        'requests': recorded
+    }), 200
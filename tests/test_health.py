@@ -0,0 +1,126 @@
+import pytest
+
+pytest.importorskip('pymongo')
+
+from utils.health import HealthMonitor, hashing_in_flight, requests_in_flight
+
+
+class FakeAdmin:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def command(self, name):
+        self.calls += 1
+        if self.error:
+            raise Exception(self.error)
+        return {'ok': 1}
+
+
+class FakeClient:
+    def __init__(self, error=None):
+        self.admin = FakeAdmin(error)
+
+
+@pytest.fixture
+def monitor():
+    monitor = HealthMonitor(interval=60)
+    yield monitor
+    monitor.stop()
+
+
+def test_database_health_before_first_ping(monitor):
+    result, status_code = monitor.database_health()
+
+    assert status_code == 500
+    assert result['error'] == 'Database not checked yet'
+
+
+def test_start_pings_synchronously(monitor):
+    client = FakeClient()
+    monitor.start(client)
+
+    assert client.admin.calls == 1
+    assert monitor.running
+    assert monitor.database_health() == ({'status': 'healthy', 'database': 'connected'}, 200)
+
+    monitor.start(client)
+    assert client.admin.calls == 1
+
+
+def test_failed_ping_reports_error(monitor):
+    monitor._client = FakeClient('connection refused')
+    monitor._ping()
+
+    result, status_code = monitor.database_health()
+    assert status_code == 500
+    assert result == {'status': 'unhealthy', 'error': 'connection refused'}
+
+
+def test_successful_ping_clears_error(monitor):
+    monitor._client = FakeClient('connection refused')
+    monitor._ping()
+    monitor._client = FakeClient()
+    monitor._ping()
+
+    result, status_code = monitor.readiness()
+    assert status_code == 200
+    assert 'error' not in result
+
+
+def test_stale_ping_is_unhealthy(monitor):
+    monitor._client = FakeClient()
+    monitor._ping()
+    monitor._last_ping_at -= monitor.max_staleness + 1
+
+    result, status_code = monitor.database_health()
+    assert status_code == 500
+    assert result['error'] == 'Database ping is stale'
+
+
+def test_heartbeats_do_not_touch_ping_error(monitor):
+    monitor._client = FakeClient('connection refused')
+    monitor._ping()
+
+    monitor._record_heartbeat(('db1', 27017), True, 0.002)
+    monitor._record_heartbeat(('db2', 27017), False, 0.5, Exception('timed out'))
+
+    assert monitor.database_health()[0]['error'] == 'connection refused'
+    servers = monitor.readiness()[0]['database']['servers']
+    assert servers['db1:27017']['error'] is None
+    assert servers['db2:27017']['error'] == 'timed out'
+
+
+def test_pool_saturation_makes_unready(monitor):
+    monitor.max_pool_size = 2
+    monitor._client = FakeClient()
+    monitor._ping()
+
+    monitor._adjust_pool(('db1', 27017), 1)
+    assert monitor.readiness()[1] == 200
+
+    monitor._adjust_pool(('db1', 27017), 1)
+    result, status_code = monitor.readiness()
+    assert status_code == 503
+    assert result['reasons'] == ['connection pool saturated']
+    assert result['pool']['checked_out'] == 2
+
+
+def test_in_flight_limits(monitor):
+    monitor._client = FakeClient()
+    monitor._ping()
+
+    with requests_in_flight, hashing_in_flight:
+        assert monitor.readiness()[1] == 200
+
+        monitor.max_requests_in_flight = 1
+        monitor.max_hashing_in_flight = 1
+        result, status_code = monitor.readiness()
+
+    assert status_code == 503
+    assert result['reasons'] == ['too many password hashes in flight', 'too many requests in flight']
+    assert monitor.readiness()[1] == 200
+
+
+def test_liveness_does_not_depend_on_database(monitor):
+    assert monitor.liveness() == ({'status': 'alive', 'monitor': 'stopped'}, 200)
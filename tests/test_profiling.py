@@ -0,0 +1,104 @@
+import time
+import pytest
+
+pytest.importorskip('flask')
+
+from flask import Flask
+from utils.profiling import Profiler, profiled, profiled_jsonify, span
+
+
+@profiled('lookup')
+def lookup():
+    with span('decode'):
+        pass
+    return 'ok'
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler()
+    yield profiler
+    profiler.disarm()
+
+
+@pytest.fixture
+def client(profiler):
+    app = Flask(__name__)
+    profiler.init_app(app)
+
+    @app.route('/lookup')
+    def lookup_view():
+        lookup()
+        return profiled_jsonify({'result': 'ok'})
+
+    @app.route('/slow')
+    def slow_view():
+        time.sleep(0.1)
+        return 'done'
+
+    return app.test_client()
+
+
+def test_nothing_recorded_when_disarmed(profiler, client):
+    assert client.get('/lookup').status_code == 200
+    assert len(profiler.requests) == 0
+
+
+def test_records_nested_spans(profiler, client):
+    profiler.arm(10)
+    client.get('/lookup')
+
+    [entry] = profiler.requests
+    assert entry['route'] == 'GET /lookup'
+    assert [(s['name'], s['depth']) for s in entry['spans']] == [('lookup', 0), ('decode', 1), ('jsonify', 0)]
+
+    summary = profiler.summary()['GET /lookup']
+    assert summary['requests'] == 1
+    assert summary['spans']['lookup']['calls'] == 1
+
+
+def test_route_and_header_filters(profiler, client):
+    profiler.arm(10, route='/slow')
+    client.get('/lookup')
+    assert len(profiler.requests) == 0
+
+    profiler.arm(10, header='X-Profile', header_value='1')
+    client.get('/lookup')
+    client.get('/lookup', headers={'X-Profile': '0'})
+    assert len(profiler.requests) == 0
+    client.get('/lookup', headers={'X-Profile': '1'})
+    assert len(profiler.requests) == 1
+
+
+def test_session_expires(profiler, client):
+    profiler.arm(0.01)
+    time.sleep(0.02)
+    client.get('/lookup')
+
+    assert len(profiler.requests) == 0
+    assert not profiler.active
+
+
+def test_request_from_previous_session_is_dropped(profiler):
+    app = Flask(__name__)
+    profiler.arm(10)
+    with app.test_request_context('/lookup'):
+        profiler.begin_request()
+        profiler.arm(10)
+        profiler.end_request()
+
+    assert len(profiler.requests) == 0
+
+
+def test_collapsed_stacks(profiler, client):
+    profiler.arm(10, interval=0.005)
+    client.get('/slow')
+
+    lines = profiler.collapsed().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack.startswith('GET /slow;')
+        assert 'slow_view' in stack
+        assert int(count) > 0
+    assert profiler.collapsed('GET /other') == ''
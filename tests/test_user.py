@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('pymongo')
+
+from bson import ObjectId
+from models.user import User
+
+
+class FakeCollection:
+    """Minimal stand-in for a users collection, applying MongoDB projection rules"""
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        ids = set(query['_id']['$in'])
+        for doc in self.docs:
+            if doc['_id'] in ids:
+                yield self._project(dict(doc), projection or {})
+
+    def _project(self, doc, projection):
+        if not projection:
+            return doc
+        if all(value == 0 for value in projection.values()):
+            return {k: v for k, v in doc.items() if k not in projection}
+        return {k: v for k, v in doc.items() if k == '_id' or k in projection}
+
+
+class FakeDB:
+    def __init__(self, docs):
+        self.users = FakeCollection(docs)
+
+
+@pytest.fixture
+def user_doc():
+    return {
+        '_id': ObjectId(),
+        'email': 'jane@example.com',
+        'first_name': 'Jane',
+        'password_hash': 'pbkdf2:sha256:secret'
+    }
+
+
+def test_get_users_by_ids_keys_results_and_marks_missing(user_doc):
+    missing = str(ObjectId())
+    results = User(FakeDB([user_doc])).get_users_by_ids([str(user_doc['_id']), missing, 'not-an-id'])
+
+    assert results[str(user_doc['_id'])]['email'] == 'jane@example.com'
+    assert results[missing] is None
+    assert results['not-an-id'] is None
+
+
+@pytest.mark.parametrize('fields', [None, ['email'], ['password_hash'], ['email', 'password_hash']])
+def test_get_users_by_ids_never_returns_password_hash(user_doc, fields):
+    results = User(FakeDB([user_doc])).get_users_by_ids([str(user_doc['_id'])], fields)
+
+    assert 'password_hash' not in results[str(user_doc['_id'])]
+
+
+def test_get_users_by_ids_normalizes_uppercase_ids(user_doc):
+    upper = str(user_doc['_id']).upper()
+    results = User(FakeDB([user_doc])).get_users_by_ids([upper])
+
+    assert list(results) == [str(user_doc['_id'])]
+    assert results[str(user_doc['_id'])]['email'] == 'jane@example.com'
@@ -0,0 +1,292 @@
+import os
+import threading
+import time
+from pymongo import monitoring
+
+
+class InFlightCounter:
+    """Thread-safe counter of work currently in progress"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def __enter__(self):
+        self.increment()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.decrement()
+        return False
+
+    def increment(self):
+        with self._lock:
+            self._value += 1
+
+    def decrement(self):
+        with self._lock:
+            self._value = max(self._value - 1, 0)
+
+    @property
+    def value(self):
+        return self._value
+
+
+# These count work already running on this worker's threads, not work waiting in a
+# queue: a sync Flask worker has no visible accept queue. A readiness limit on them
+# only means something when the worker has spare threads to answer the probe.
+
+# Password hashes currently being generated or checked (see models/user.py)
+hashing_in_flight = InFlightCounter()
+
+# Requests currently being handled by this worker's threads, excluding health probes
+requests_in_flight = InFlightCounter()
+
+
+class _HeartbeatListener(monitoring.ServerHeartbeatListener):
+    def __init__(self, monitor):
+        self.monitor = monitor
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.monitor._record_heartbeat(event.connection_id, True, event.duration)
+
+    def failed(self, event):
+        self.monitor._record_heartbeat(event.connection_id, False, event.duration, event.reply)
+
+
+class _TopologyListener(monitoring.TopologyListener):
+    def __init__(self, monitor):
+        self.monitor = monitor
+
+    def opened(self, event):
+        pass
+
+    def description_changed(self, event):
+        self.monitor._record_topology(event.new_description)
+
+    def closed(self, event):
+        self.monitor._record_topology(None)
+
+
+class _PoolListener(monitoring.ConnectionPoolListener):
+    def __init__(self, monitor):
+        self.monitor = monitor
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        self.monitor._reset_pool(event.address)
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        self.monitor._adjust_pool(event.address, 1)
+
+    def connection_checked_in(self, event):
+        self.monitor._adjust_pool(event.address, -1)
+
+
+class HealthMonitor:
+    """Background MongoDB health monitor.
+
+    Pings the database on its own schedule and listens to pymongo heartbeat,
+    topology and connection pool events, so that liveness and readiness probes
+    can be answered from memory without touching the database.
+    """
+    def __init__(self, interval=5.0, max_staleness=None, max_pool_size=100,
+                 pool_saturation_threshold=0.9, max_hashing_in_flight=None, max_requests_in_flight=None):
+        self.interval = interval
+        self.max_staleness = max_staleness if max_staleness is not None else interval * 3
+        self.max_pool_size = max_pool_size
+        self.pool_saturation_threshold = pool_saturation_threshold
+        # None disables the check
+        self.max_hashing_in_flight = max_hashing_in_flight
+        self.max_requests_in_flight = max_requests_in_flight
+
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._client = None
+
+        self._last_ping_ok = None
+        self._last_ping_at = None
+        self._last_ping_ms = None
+        self._last_error = None
+        self._servers = {}
+        self._has_readable_server = None
+        self._pool_checked_out = {}
+
+    @property
+    def listeners(self):
+        """Event listeners to pass to MongoClient(event_listeners=...)"""
+        return [_HeartbeatListener(self), _TopologyListener(self), _PoolListener(self)]
+
+    @property
+    def running(self):
+        """Whether the ping thread is running in this process"""
+        return self._pid == os.getpid() and self._thread is not None and self._thread.is_alive()
+
+    def start(self, client):
+        """Start pinging the given client from a daemon thread.
+
+        Safe to call on every request: it is a no-op while the thread is running
+        in this process, and restarts it after a fork (e.g. gunicorn --preload).
+        The first ping runs synchronously so the calling request already sees a
+        real database state.
+        """
+        if self.running:
+            return
+        with self._start_lock:
+            if self.running:
+                return
+            self._client = client
+            self._ping()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._ping()
+
+    def _ping(self):
+        started = time.monotonic()
+        try:
+            self._client.admin.command('ping')
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, str(e)
+        duration_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            self._last_ping_ok = ok
+            self._last_ping_at = time.time()
+            self._last_ping_ms = round(duration_ms, 2)
+            self._last_error = error
+
+    def _record_heartbeat(self, address, ok, duration, error=None):
+        with self._lock:
+            self._servers[_format_address(address)] = {
+                'ok': ok,
+                'latency_ms': round(duration * 1000, 2),
+                'at': time.time(),
+                'error': None if ok else str(error)
+            }
+
+    def _record_topology(self, description):
+        with self._lock:
+            self._has_readable_server = description.has_readable_server() if description else False
+
+    def _adjust_pool(self, address, delta):
+        key = _format_address(address)
+        with self._lock:
+            self._pool_checked_out[key] = max(self._pool_checked_out.get(key, 0) + delta, 0)
+
+    def _reset_pool(self, address):
+        with self._lock:
+            self._pool_checked_out.pop(_format_address(address), None)
+
+    def liveness(self):
+        """Whether this worker is alive; never depends on the database or on load"""
+        return {'status': 'alive', 'monitor': 'running' if self.running else 'stopped'}, 200
+
+    def database_health(self):
+        """Cached database connectivity, in the original /health response shape"""
+        with self._lock:
+            ok = self._last_ping_ok
+            last_ping_at = self._last_ping_at
+            last_error = self._last_error
+
+        if last_ping_at is None:
+            return {'status': 'unhealthy', 'error': 'Database not checked yet'}, 500
+        if time.time() - last_ping_at > self.max_staleness:
+            return {'status': 'unhealthy', 'error': 'Database ping is stale'}, 500
+        if not ok:
+            return {'status': 'unhealthy', 'error': last_error or 'Database unreachable'}, 500
+        return {'status': 'healthy', 'database': 'connected'}, 200
+
+    def readiness(self):
+        """Cached readiness state built from the latest ping and driver events"""
+        now = time.time()
+        with self._lock:
+            checked_out = max(self._pool_checked_out.values(), default=0)
+            ping_age = now - self._last_ping_at if self._last_ping_at else None
+            database = {
+                'connected': bool(self._last_ping_ok),
+                'last_ping_ms': self._last_ping_ms,
+                'last_ping_age_s': round(ping_age, 2) if ping_age is not None else None,
+                'has_readable_server': self._has_readable_server,
+                'servers': dict(self._servers)
+            }
+            last_error = self._last_error
+
+        saturation = checked_out / self.max_pool_size if self.max_pool_size else 0.0
+        hashing = hashing_in_flight.value
+        in_flight = requests_in_flight.value
+
+        reasons = []
+        if ping_age is None:
+            reasons.append('database not checked yet')
+        elif not database['connected']:
+            reasons.append('database unreachable')
+        elif ping_age > self.max_staleness:
+            reasons.append('database ping is stale')
+        if database['has_readable_server'] is False:
+            reasons.append('no readable server')
+        if saturation >= self.pool_saturation_threshold:
+            reasons.append('connection pool saturated')
+        if self.max_hashing_in_flight and hashing >= self.max_hashing_in_flight:
+            reasons.append('too many password hashes in flight')
+        if self.max_requests_in_flight and in_flight >= self.max_requests_in_flight:
+            reasons.append('too many requests in flight')
+
+        ready = not reasons
+        result = {
+            'status': 'healthy' if ready else 'unhealthy',
+            'database': database,
+            'pool': {
+                'checked_out': checked_out,
+                'max_size': self.max_pool_size,
+                'saturation': round(saturation, 3)
+            },
+            'hashing_in_flight': hashing,
+            'requests_in_flight': in_flight
+        }
+        if not ready:
+            result['reasons'] = reasons
+            if last_error:
+                result['error'] = last_error
+        return result, 200 if ready else 503
+
+
+def _format_address(address):
+    if isinstance(address, tuple):
+        return f"{address[0]}:{address[1]}"
+    return str(address)
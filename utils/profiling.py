@@ -0,0 +1,244 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from functools import wraps
+from flask import request, jsonify
+
+# Per-thread profile of the request currently being handled (None when not profiled)
+_local = threading.local()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('record', 'name', 'started', 'entry')
+
+    def __init__(self, record, name):
+        self.record = record
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.entry = {
+            'name': self.name,
+            'start_ms': round((self.started - self.record.started) * 1000, 3),
+            'depth': self.record.depth
+        }
+        self.record.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record.depth -= 1
+        self.entry['duration_ms'] = round((time.perf_counter() - self.started) * 1000, 3)
+        self.record.spans.append(self.entry)
+        return False
+
+
+class _RequestProfile:
+    def __init__(self, route, generation):
+        self.route = route
+        self.generation = generation
+        self.started = time.perf_counter()
+        self.depth = 0
+        self.spans = []
+
+
+def span(name):
+    """Time a block as a named span of the current request, if it is being profiled"""
+    record = getattr(_local, 'record', None)
+    if record is None:
+        return _NULL_SPAN
+    return _Span(record, name)
+
+
+def profiled(name=None):
+    """Decorator recording each call as a span of the current request, if it is being profiled"""
+    def decorator(f):
+        label = name or f.__qualname__
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            record = getattr(_local, 'record', None)
+            if record is None:
+                return f(*args, **kwargs)
+            with _Span(record, label):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@profiled('jsonify')
+def profiled_jsonify(*args, **kwargs):
+    """flask.jsonify, recorded as a span when the request is being profiled"""
+    return jsonify(*args, **kwargs)
+
+
+class Profiler:
+    """On-demand sampling profiler for request handling threads.
+
+    Disarmed by default. Once armed for a number of seconds, requests matching
+    the optional route and header filters get their spans recorded, and a
+    background thread samples their stacks into per-route collapsed stacks.
+    State is per process, so each gunicorn worker has its own session.
+    """
+    def __init__(self, max_requests=200):
+        self._lock = threading.Lock()
+        self._threads = {}
+        self._generation = 0
+        self.active = False
+        self.deadline = 0.0
+        self.route = None
+        self.header = None
+        self.header_value = None
+        self.interval = 0.01
+        self.samples = {}
+        self.requests = deque(maxlen=max_requests)
+
+    def init_app(self, app):
+        app.before_request(self.begin_request)
+        app.teardown_request(self.end_request)
+
+    def arm(self, duration, route=None, header=None, header_value=None, interval=0.01):
+        """Start profiling matching requests for `duration` seconds, discarding previous results"""
+        with self._lock:
+            self.route = route
+            self.header = header
+            self.header_value = header_value
+            self.interval = interval
+            self.deadline = time.monotonic() + duration
+            self.samples = {}
+            self.requests.clear()
+            self.active = True
+            self._generation += 1
+            generation = self._generation
+        threading.Thread(target=self._sample, args=(generation,), name='profiler-sampler', daemon=True).start()
+
+    def disarm(self):
+        self.active = False
+
+    def status(self):
+        remaining = max(self.deadline - time.monotonic(), 0.0) if self.active else 0.0
+        return {
+            'active': self.active,
+            'remaining_s': round(remaining, 2),
+            'route': self.route,
+            'header': self.header,
+            'header_value': self.header_value,
+            'interval_ms': round(self.interval * 1000, 3),
+            'sampled_routes': sorted(self.samples),
+            'recorded_requests': len(self.requests)
+        }
+
+    def _matches(self):
+        if request.blueprint == 'profiling':
+            return False
+        if self.route:
+            rule = request.url_rule.rule if request.url_rule else None
+            if self.route not in (rule, request.path, request.endpoint):
+                return False
+        if self.header:
+            value = request.headers.get(self.header)
+            if value is None or (self.header_value is not None and value != self.header_value):
+                return False
+        return True
+
+    def begin_request(self):
+        if not self.active:
+            return
+        if time.monotonic() >= self.deadline:
+            self.active = False
+            return
+        if not self._matches():
+            return
+        rule = request.url_rule.rule if request.url_rule else request.path
+        record = _RequestProfile(f"{request.method} {rule}", self._generation)
+        _local.record = record
+        with self._lock:
+            self._threads[threading.get_ident()] = (record.route, record.generation)
+
+    def end_request(self, exception=None):
+        record = getattr(_local, 'record', None)
+        if record is None:
+            return
+        _local.record = None
+        with self._lock:
+            self._threads.pop(threading.get_ident(), None)
+            # Started under an earlier arm() whose results were discarded
+            if record.generation != self._generation:
+                return
+            self.requests.append({
+                'route': record.route,
+                'duration_ms': round((time.perf_counter() - record.started) * 1000, 3),
+                'error': str(exception) if exception else None,
+                'spans': sorted(record.spans, key=lambda s: s['start_ms'])
+            })
+
+    def _sample(self, generation):
+        while self.active and generation == self._generation:
+            if time.monotonic() >= self.deadline:
+                self.active = False
+                break
+            with self._lock:
+                threads = list(self._threads.items())
+            if threads:
+                frames = sys._current_frames()
+                for ident, (route, started_in) in threads:
+                    frame = frames.get(ident)
+                    if frame is not None and started_in == generation:
+                        stack = _collapse(frame)
+                        with self._lock:
+                            if generation == self._generation:
+                                self.samples.setdefault(route, Counter())[stack] += 1
+            time.sleep(self.interval)
+
+    def collapsed(self, route=None):
+        """Samples in collapsed-stack format (`route;frame;frame count` per line)"""
+        with self._lock:
+            samples = {r: dict(c) for r, c in self.samples.items() if route is None or r == route}
+        lines = []
+        for r, counts in sorted(samples.items()):
+            for stack, count in sorted(counts.items(), key=lambda item: -item[1]):
+                lines.append(f"{r};{stack} {count}")
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def summary(self):
+        """Total and mean time per span name for each route across recorded requests"""
+        routes = {}
+        for entry in list(self.requests):
+            route = routes.setdefault(entry['route'], {'requests': 0, 'total_ms': 0.0, 'spans': {}})
+            route['requests'] += 1
+            route['total_ms'] += entry['duration_ms']
+            for s in entry['spans']:
+                stats = route['spans'].setdefault(s['name'], {'calls': 0, 'total_ms': 0.0})
+                stats['calls'] += 1
+                stats['total_ms'] += s['duration_ms']
+        for route in routes.values():
+            route['mean_ms'] = round(route['total_ms'] / route['requests'], 3)
+            route['total_ms'] = round(route['total_ms'], 3)
+            for stats in route['spans'].values():
+                stats['mean_ms'] = round(stats['total_ms'] / stats['calls'], 3)
+                stats['total_ms'] = round(stats['total_ms'], 3)
+        return routes
+
+
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+profiler = Profiler()